@@ -0,0 +1,153 @@
+"""Isolated cupy imports for hmm."""
+
+__author__ = ["miraep8"]
+
+from functools import lru_cache
+
+import numpy as np
+
+# one thread per hidden state j, looping over the observations i. Each thread
+# computes max_k(prev_col[k] + log_trans[k, j]) + log_emi[i, j] for its state,
+# with prev_col and cur_col double buffered in shared memory so that a single
+# __syncthreads per observation suffices.
+_VITERBI_KERNEL = r"""
+extern "C" __global__
+void viterbi(
+    const {dtype}* log_trans,
+    const {dtype}* log_emi,
+    const {dtype}* log_init,
+    {dtype}* final_col,
+    int* trans_id,
+    {dtype}* trans_prob,
+    const int num_obs,
+    const int num_states,
+    const int store_trans_prob
+) {{
+    extern __shared__ unsigned char shared[];
+    {dtype}* prev_col = reinterpret_cast<{dtype}*>(shared);
+    {dtype}* cur_col = prev_col + num_states;
+    const int j = threadIdx.x;
+
+    if (j < num_states) {{
+        prev_col[j] = log_init[j] + log_emi[j];
+        if (store_trans_prob) {{
+            trans_prob[j] = prev_col[j];
+        }}
+    }}
+    __syncthreads();
+
+    for (int i = 1; i < num_obs; i++) {{
+        if (j < num_states) {{
+            const {dtype} emi = log_emi[i * num_states + j];
+            // ties are resolved in favour of the lowest state id, as in np.argmax
+            {dtype} best = prev_col[0] + log_trans[j] + emi;
+            int best_id = 0;
+            for (int k = 1; k < num_states; k++) {{
+                const {dtype} path = prev_col[k] + log_trans[k * num_states + j] + emi;
+                if (path > best) {{
+                    best = path;
+                    best_id = k;
+                }}
+            }}
+            cur_col[j] = best;
+            trans_id[i * num_states + j] = best_id;
+            if (store_trans_prob) {{
+                trans_prob[i * num_states + j] = best;
+            }}
+        }}
+        __syncthreads();
+        {dtype}* tmp = prev_col;
+        prev_col = cur_col;
+        cur_col = tmp;
+    }}
+
+    if (j < num_states) {{
+        final_col[j] = prev_col[j];
+    }}
+}}
+"""
+
+_C_TYPES = {np.dtype("float64"): "double", np.dtype("float32"): "float"}
+
+
+@lru_cache(maxsize=None)
+def _get_viterbi_kernel(dtype):
+    """Compile the Viterbi kernel for a float dtype, cached per dtype."""
+    import cupy
+
+    code = _VITERBI_KERNEL.format(dtype=_C_TYPES[dtype])
+    return cupy.RawKernel(code, "viterbi")
+
+
+def _calculate_trans_mats_cupy(
+    log_trans: np.ndarray,
+    log_emi: np.ndarray,
+    log_init: np.ndarray,
+    store_trans_prob: bool = False,
+):
+    """Calculate the Viterbi transition mats on a CUDA GPU.
+
+    Runs the Viterbi recursion in a single block with one thread per hidden state,
+    and copies the results back to host memory for the traceback.
+
+    Parameters
+    ----------
+    log_trans : 2D np.ndarray, shape = [num_states, num_states]
+        The log of the transition probability matrix.
+    log_emi : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        The log of the emission probability of each observation in each state.
+    log_init : 1D np.ndarray, shape = [num_hidden_states]
+        The log of the initial probability of each hidden state.
+    store_trans_prob : bool, optional, default=False
+        Whether to also return the full trans_prob matrix.
+
+    Returns
+    -------
+    final_col : 1D np.ndarray, shape = [num_hidden_states]
+        The max log probability of each state at the last step.
+    trans_id : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        The most likely preceding state of each state at each step.
+    trans_prob : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        The max log probability of each state at each step.
+        None if ``store_trans_prob`` is False.
+    """
+    import cupy
+
+    num_obs, num_states = log_emi.shape
+    dtype = log_emi.dtype
+    kernel = _get_viterbi_kernel(dtype)
+    if num_states > kernel.max_threads_per_block:
+        raise ValueError(
+            f"The cuda device supports at most {kernel.max_threads_per_block} "
+            f"hidden states, but got {num_states}."
+        )
+
+    log_trans_d = cupy.asarray(log_trans, dtype=dtype, order="C")
+    log_emi_d = cupy.asarray(log_emi, order="C")
+    log_init_d = cupy.asarray(log_init, dtype=dtype)
+    final_col_d = cupy.empty(num_states, dtype=dtype)
+    trans_id_d = cupy.zeros((num_obs, num_states), dtype=np.int32)
+    # the kernel needs a valid pointer even if trans_prob is not stored
+    trans_prob_d = cupy.empty(
+        (num_obs, num_states) if store_trans_prob else 1, dtype=dtype
+    )
+
+    kernel(
+        (1,),
+        (num_states,),
+        (
+            log_trans_d,
+            log_emi_d,
+            log_init_d,
+            final_col_d,
+            trans_id_d,
+            trans_prob_d,
+            np.int32(num_obs),
+            np.int32(num_states),
+            np.int32(store_trans_prob),
+        ),
+        shared_mem=2 * num_states * dtype.itemsize,
+    )
+
+    trans_prob = cupy.asnumpy(trans_prob_d) if store_trans_prob else None
+    return cupy.asnumpy(final_col_d), cupy.asnumpy(trans_id_d), trans_prob
@@ -0,0 +1,154 @@
+"""Isolated numba imports for hmm."""
+
+__author__ = ["miraep8"]
+
+import numpy as np
+
+from sktime.utils.numba.njit import njit
+
+
+@njit(cache=True)
+def _calculate_trans_mats_numba(
+    log_trans: np.ndarray,
+    log_emi: np.ndarray,
+    log_init: np.ndarray,
+    final_col: np.ndarray,
+    trans_id: np.ndarray,
+    trans_prob: np.ndarray,
+):
+    """Fill in the Viterbi transition mats, compiled to no_python.
+
+    Only the max log probabilities of the previous and current step are kept
+    while iterating, unless ``trans_prob`` has a row per observation.
+
+    Parameters
+    ----------
+    log_trans : 2D np.ndarray, shape = [num_states, num_states]
+        The log of the transition probability matrix.
+    log_emi : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        The log of the emission probability of each observation in each state.
+    log_init : 1D np.ndarray, shape = [num_hidden_states]
+        The log of the initial probability of each hidden state.
+    final_col : 1D np.ndarray, shape = [num_hidden_states]
+        Array to write the max log probability of each state at the last step into.
+    trans_id : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        Array to write the most likely preceding state of each state into.
+    trans_prob : 2D np.ndarray, shape = [num_observations or 0, num_hidden_states]
+        Array to write the max log probability of each state at each step into.
+        Left untouched if it has no rows.
+    """
+    num_obs, num_states = log_emi.shape
+    store_trans_prob = trans_prob.shape[0] > 0
+    prev_col = np.empty(num_states, dtype=log_emi.dtype)
+    cur_col = np.empty(num_states, dtype=log_emi.dtype)
+    for j in range(num_states):
+        prev_col[j] = log_init[j] + log_emi[0, j]
+        if store_trans_prob:
+            trans_prob[0, j] = prev_col[j]
+    for i in range(1, num_obs):
+        for j in range(num_states):
+            # ties are resolved in favour of the lowest state id, as in np.argmax
+            best = prev_col[0] + log_trans[0, j] + log_emi[i, j]
+            best_id = 0
+            for k in range(1, num_states):
+                path = prev_col[k] + log_trans[k, j] + log_emi[i, j]
+                if path > best:
+                    best = path
+                    best_id = k
+            cur_col[j] = best
+            trans_id[i, j] = best_id
+            if store_trans_prob:
+                trans_prob[i, j] = best
+        prev_col, cur_col = cur_col, prev_col
+    final_col[:] = prev_col
+
+
+@njit(cache=True)
+def _viterbi_traceback_numba(
+    final_col: np.ndarray, trans_id: np.ndarray, max_inds: np.ndarray
+):
+    """Trace back the most likely path of hidden states, compiled to no_python.
+
+    Parameters
+    ----------
+    final_col : 1D np.ndarray, shape = [num_hidden_states]
+        The max log probability of each state at the last step.
+    trans_id : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+        The most likely preceding state of each state at each step.
+    max_inds : 1D np.ndarray, shape = [num_observations]
+        Array to write the index of the most likely state at each step into.
+    """
+    num_obs = trans_id.shape[0]
+    max_inds[num_obs - 1] = np.argmax(final_col)
+    for index in range(num_obs - 1, 0, -1):
+        max_inds[index - 1] = trans_id[index, max_inds[index]]
+
+
+@njit(cache=True)
+def _calculate_trans_mats_2state_numba(
+    log_trans: np.ndarray,
+    log_emi: np.ndarray,
+    log_init: np.ndarray,
+    final_col: np.ndarray,
+    trans_id: np.ndarray,
+    trans_prob: np.ndarray,
+):
+    """Fill in the Viterbi transition mats for 2 hidden states, compiled to no_python.
+
+    Same as ``_calculate_trans_mats_numba``, with the loops over the hidden states
+    unrolled, and the probabilities of the previous step kept in scalars.
+
+    Parameters
+    ----------
+    log_trans : 2D np.ndarray, shape = [2, 2]
+        The log of the transition probability matrix.
+    log_emi : 2D np.ndarray, shape = [num_observations, 2]
+        The log of the emission probability of each observation in each state.
+    log_init : 1D np.ndarray, shape = [2]
+        The log of the initial probability of each hidden state.
+    final_col : 1D np.ndarray, shape = [2]
+        Array to write the max log probability of each state at the last step into.
+    trans_id : 2D np.ndarray, shape = [num_observations, 2]
+        Array to write the most likely preceding state of each state into.
+    trans_prob : 2D np.ndarray, shape = [num_observations or 0, 2]
+        Array to write the max log probability of each state at each step into.
+        Left untouched if it has no rows.
+    """
+    num_obs = log_emi.shape[0]
+    store_trans_prob = trans_prob.shape[0] > 0
+    trans_00 = log_trans[0, 0]
+    trans_01 = log_trans[0, 1]
+    trans_10 = log_trans[1, 0]
+    trans_11 = log_trans[1, 1]
+    prev_0 = log_init[0] + log_emi[0, 0]
+    prev_1 = log_init[1] + log_emi[0, 1]
+    if store_trans_prob:
+        trans_prob[0, 0] = prev_0
+        trans_prob[0, 1] = prev_1
+    for i in range(1, num_obs):
+        emi_0 = log_emi[i, 0]
+        emi_1 = log_emi[i, 1]
+        # ties are resolved in favour of state 0, as in np.argmax
+        path_00 = prev_0 + trans_00 + emi_0
+        path_10 = prev_1 + trans_10 + emi_0
+        if path_10 > path_00:
+            cur_0 = path_10
+            trans_id[i, 0] = 1
+        else:
+            cur_0 = path_00
+            trans_id[i, 0] = 0
+        path_01 = prev_0 + trans_01 + emi_1
+        path_11 = prev_1 + trans_11 + emi_1
+        if path_11 > path_01:
+            cur_1 = path_11
+            trans_id[i, 1] = 1
+        else:
+            cur_1 = path_01
+            trans_id[i, 1] = 0
+        if store_trans_prob:
+            trans_prob[i, 0] = cur_0
+            trans_prob[i, 1] = cur_1
+        prev_0 = cur_0
+        prev_1 = cur_1
+    final_col[0] = prev_0
+    final_col[1] = prev_1
@@ -4,4 +4,22 @@
 
 __all__ = ["PyODAnnotator"]
 
-from sktime.annotation.adapters._pyod import PyODAnnotator
+from importlib import import_module
+
+# adapters are imported on first access, see PEP 562,
+# so importing this package does not import the adapted libraries' dependencies
+_lazy_imports = {
+    "PyODAnnotator": "sktime.annotation.adapters._pyod",
+}
+
+
+def __getattr__(name):
+    """Import adapters lazily on first attribute access."""
+    if name in _lazy_imports:
+        return getattr(import_module(_lazy_imports[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Return the public names of the module, including lazily imported ones."""
+    return sorted(list(globals()) + __all__)
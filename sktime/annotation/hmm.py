@@ -5,16 +5,28 @@ about the algorithm, check out the `HMM wikipedia page
 <https://en.wikipedia.org/wiki/Hidden_Markov_model>`_.
 """
 import warnings
-from typing import Tuple
+from functools import partial
+from typing import Callable, List, Optional, Tuple
 
 import numpy as np
+from scipy.special import logsumexp
 from scipy.stats import norm
 
 from sktime.annotation.base._base import BaseSeriesAnnotator
+from sktime.utils.dependencies import _check_soft_dependencies
+from sktime.utils.parallel import parallelize
+from sktime.utils.validation.series import check_series
 
 __author__ = ["miraep8"]
 __all__ = ["HMM"]
 
+# smallest positive float, emission probs of 0 are clipped to this
+_TINY = np.finfo(float).tiny
+# log of the normalizing constant of the standard normal PDF
+_LOG_SQRT_2PI = 0.5 * np.log(2 * np.pi)
+# log densities of scipy.stats distributions, by name of the density
+_LOG_DENSITY_NAMES = {"pdf": "logpdf", "pmf": "logpmf"}
+
 
 class HMM(BaseSeriesAnnotator):
     """Implements a simple HMM fitted with Viterbi algorithm.
@@ -45,8 +57,8 @@ class HMM(BaseSeriesAnnotator):
     distribution are required to be passed to the algorithm.
 
     _predict - first the transition_probability and transition_id matrices are
-    calculated - these are both nxm matrices, where n is the number of
-    hidden states and m is the number of observations. The transition
+    calculated - these are both mxn matrices, where m is the number of
+    observations and n is the number of hidden states. The transition
     probability matrices record the probability of the most likely
     sequence which has observation ``m`` being assigned to hidden state n.
     The transition_id matrix records the step before hidden state n that
@@ -67,7 +79,13 @@ class HMM(BaseSeriesAnnotator):
         fx_1(X, **kwargs) -> float (or a list with some mixture of the two).
         The callables should take a value and return a probability when passed
         a single observation. All functions should be properly normalized PDFs
-        over the same space as the observed data.
+        over the same space as the observed data. Callables should preferably
+        also accept a 1D np.ndarray of observations and return an array of
+        probabilities of the same shape, as they are then called only once
+        per hidden state; otherwise they are called once per observation.
+        Keyword arguments can also be bound with ``functools.partial``, e.g.,
+        ``partial(norm.pdf, loc=0, scale=1)``, which is equivalent to
+        ``(norm.pdf, {"loc": 0, "scale": 1})``.
     transition_prob_mat: 2D np.ndarry, shape = [num_states, num_states]
         Each row should sum to 1 in order to be properly normalized
         (ie the j'th column in the i'th row represents the
@@ -79,6 +97,53 @@ class HMM(BaseSeriesAnnotator):
         list and the transition_prob_mat. The initial probs should be reflective
         of prior beliefs.  If none is passed will each hidden state will be
         assigned an equal initial prob.
+    backend : str, optional, default=None
+        Backend used to compute the emission probabilities of the hidden states
+        in parallel, one per hidden state. Directly passed to
+        ``utils.parallel.parallelize``, valid values are:
+
+        - "None": executes loop sequentally, simple list comprehension
+        - "loky", "multiprocessing" and "threading": uses ``joblib.Parallel`` loops
+        - "joblib": custom and 3rd party ``joblib`` backends, e.g., ``spark``
+        - "dask": uses ``dask``, requires ``dask`` package in environment
+
+        "threading" is recommended for vectorized emission functions such as
+        ``scipy.stats`` PDFs, which mostly run in numpy without holding the GIL.
+    backend_params : dict, optional
+        additional parameters passed to the backend as config.
+        Directly passed to ``utils.parallel.parallelize``.
+        Valid keys depend on the value of ``backend``:
+
+        - "None": no additional parameters, ``backend_params`` is ignored
+        - "loky", "multiprocessing" and "threading": default ``joblib`` backends
+          any valid keys for ``joblib.Parallel`` can be passed here, e.g., ``n_jobs``,
+          with the exception of ``backend`` which is directly controlled by ``backend``.
+          If ``n_jobs`` is not passed, it will default to ``-1``, other parameters
+          will default to ``joblib`` defaults.
+        - "joblib": custom and 3rd party ``joblib`` backends, e.g., ``spark``.
+          any valid keys for ``joblib.Parallel`` can be passed here, e.g., ``n_jobs``,
+          ``backend`` must be passed as a key of ``backend_params`` in this case.
+          If ``n_jobs`` is not passed, it will default to ``-1``, other parameters
+          will default to ``joblib`` defaults.
+        - "dask": any valid keys for ``dask.compute`` can be passed, e.g., ``scheduler``
+    store_trans_prob : bool, optional, default=False
+        Whether to store the max probability of each hidden state for every
+        observation in the ``trans_prob`` attribute, e.g., for inspection.
+        Only the probabilities of the last observation are needed to label the
+        observations, so by default the full matrix is never allocated.
+    dtype : str or np.dtype, optional, default="float64"
+        Float dtype of the log probabilities used in the Viterbi algorithm,
+        and in the forward-backward algorithm of ``predict_proba``.
+        "float32" halves the memory traffic of the Viterbi recursion, but path
+        log probabilities grow in magnitude with the number of observations, and
+        float32 resolves differences between them only up to about 1e-7 of that
+        magnitude, so the most likely path may be missed on long series.
+    device : str, optional, default="cpu"
+        Device to run the Viterbi recursion on, one of "cpu" or "cuda".
+        "cuda" runs it on a CUDA GPU with one thread per hidden state, which
+        requires ``cupy``. The emission probabilities and the traceback are still
+        computed on the cpu. Pays off for very long series, roughly once the
+        number of observations times the number of hidden states exceeds 1e6.
 
     Attributes
     ----------
@@ -95,8 +160,8 @@ class HMM(BaseSeriesAnnotator):
     num_states : int
         The number of hidden states.  Set to be the length of the emission_funcs
         parameter which was passed.
-    states : list
-        A list of integers from 0 to num_states-1.  Integer labels for the hidden
+    states : 1D np.ndarray of np.int32, shape = [num_hidden_states]
+        An array of integers from 0 to num_states-1.  Integer labels for the hidden
         states.
     num_obs : int
         The length of the observations data.  Extracted from data.
@@ -104,6 +169,7 @@ class HMM(BaseSeriesAnnotator):
         Shape [num observations, num hidden states]. The max probability that that
         observation is assigned to that hidden state.
         Calculated in _calculate_trans_mat and assigned in _predict.
+        Only stored if ``store_trans_prob`` is True, otherwise None.
     trans_id : 2D np.ndarray, shape = [num_observations, num_hidden_states]
         Shape [num observations, num hidden states]. The state id of the state
         proceeding the observation is assigned to that hidden state in the most
@@ -112,14 +178,15 @@ class HMM(BaseSeriesAnnotator):
 
     Examples
     --------
+    >>> from functools import partial
     >>> from sktime.annotation.hmm import HMM
     >>> from scipy.stats import norm
     >>> from numpy import asarray
     >>> # define the emission probs for our HMM model:
     >>> centers = [3.5,-5]
     >>> sd = [.25 for i in centers]
-    >>> emi_funcs = [(norm.pdf, {'loc': mean,
-    ...  'scale': sd[ind]}) for ind, mean in enumerate(centers)]
+    >>> emi_funcs = [partial(norm.pdf, loc=mean, scale=sd[ind])
+    ...  for ind, mean in enumerate(centers)]
     >>> hmm_est = HMM(emi_funcs, asarray([[0.25,0.75], [0.666, 0.333]]))
     >>> # generate synthetic data (or of course use your own!)
     >>> obs = asarray([3.7,3.2,3.4,3.6,-5.1,-5.2,-4.9])
@@ -140,13 +207,51 @@ class HMM(BaseSeriesAnnotator):
         emission_funcs: list,
         transition_prob_mat: np.ndarray,
         initial_probs: np.ndarray = None,
+        backend: str = None,
+        backend_params: dict = None,
+        store_trans_prob: bool = False,
+        dtype="float64",
+        device="cpu",
     ):
         self.initial_probs = initial_probs
         self.emission_funcs = emission_funcs
         self.transition_prob_mat = transition_prob_mat
+        self.backend = backend
+        self.backend_params = backend_params
+        self.store_trans_prob = store_trans_prob
+        self.dtype = dtype
+        self.device = device
+
         super().__init__()
         self._validate_init()
 
+        if device == "cuda":
+            self.set_tags(**{"python_dependencies": "cupy"})
+            _check_soft_dependencies("cupy", severity="error", obj=self)
+        self._emission_callables = self._make_emission_callables(emission_funcs)
+
+    @staticmethod
+    def _make_emission_callables(emission_funcs: list) -> List[Callable]:
+        """Bind the kwargs of emission funcs passed as tuples with partial.
+
+        Parameters
+        ----------
+        emission_funcs : list, shape = [num_hidden_states]
+            Either callables or tuples of callables and matched keyword
+            arguments, as in the __init__ param of same name.
+
+        Returns
+        -------
+        emission_callables : list of callables, shape = [num_hidden_states]
+            Callables with signature fx(X), taking no further arguments.
+        """
+        return [
+            partial(emission[0], **emission[1])
+            if isinstance(emission, tuple)
+            else emission
+            for emission in emission_funcs
+        ]
+
     def _validate_init(self):
         """Verify the parameters passed to init.
 
@@ -156,6 +261,8 @@ class HMM(BaseSeriesAnnotator):
             - transition_prob_mat is square.
             - all the rows of transition_prob_mat sum to 1.
             - if passed initial_probs, is all sums to 1.
+            - dtype is float32 or float64.
+            - device is one of "cpu" or "cuda".
         """
         tran_mat_len = self.transition_prob_mat.shape[0]
         # transition_prob_mat should be square:
@@ -183,27 +290,49 @@ class HMM(BaseSeriesAnnotator):
                 f" as they all correspond to the same underlying list of hidden"
                 f" states."
             )
-        # sum of all rows in transition_prob_mat should be 1.
-        if not np.isclose(
-            np.ones(tran_mat_len),
-            np.sum(self.transition_prob_mat, axis=1),
-            rtol=5e-2,
-        ).all():
+        # sum of all rows in transition_prob_mat should be 1, up to rounding of
+        # the probabilities, e.g., [0.666, 0.333].
+        row_sums = np.sum(self.transition_prob_mat, axis=1)
+        if not np.allclose(row_sums, 1.0, rtol=0, atol=5e-2):
             raise ValueError("The sum of all rows in the transition matrix must be 1.")
         # sum of all initial_probs should be 1 if it is provided.
-        if self.initial_probs is not None and sum(self.initial_probs) != 1:
+        if self.initial_probs is not None and not np.isclose(
+            np.sum(self.initial_probs), 1.0
+        ):
             raise ValueError("Sum of initial probs should be 1.")
+        # the Viterbi kernels are only defined for float32 and float64:
+        try:
+            dtype = np.dtype(self.dtype)
+        except TypeError:
+            dtype = None
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(
+                f'dtype must be one of "float32" or "float64", but got {self.dtype}'
+            )
+        if self.device not in ("cpu", "cuda"):
+            raise ValueError(
+                f'device must be one of "cpu" or "cuda", but got {self.device}'
+            )
 
     @staticmethod
     def _calculate_trans_mats(
         initial_probs: np.ndarray,
-        emi_probs: np.ndarray,
+        log_emi: np.ndarray,
         transition_prob_mat: np.ndarray,
         num_obs: int,
         num_states: int,
-    ) -> Tuple[np.array, np.array]:
+        store_trans_prob: bool = False,
+        device: str = "cpu",
+    ) -> Tuple[np.array, np.array, Optional[np.array]]:
         """Calculate the transition mats used in the Viterbi algorithm.
 
+        Uses a cupy implementation if device is "cuda". Otherwise, uses a numba
+        compiled implementation if numba is installed, with a dedicated version
+        for 2 hidden states, and a vectorized numpy implementation if not.
+        All only keep the max probabilities of the previous and current
+        observation while iterating, unless ``store_trans_prob`` is True.
+        All log probabilities are computed in the float dtype of ``log_emi``.
+
         Parameters
         ----------
         initial_probs : 1D np.ndarray, shape = [num_hidden_states]
@@ -211,12 +340,12 @@ class HMM(BaseSeriesAnnotator):
             represents the number of hidden states in the model. It
             contains the probability that hidden state for the state
             before the first observation was state n.  Should sum to 1.
-        emi_probs : 2D np.ndarray, shape = [num_observations, num_hidden_states]
-            A nxm dimensional arrayof floats, where n is the
-            number of hidden states and m is the number of observations.
-            For a given observation, it should contain the probability that it
-            could havbe been generated (ie emitted) from each of the hidden states
-            Each entry should be between 0 and 1
+        log_emi : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            A mxn dimensional array of floats, where m is the
+            number of observations and n is the number of hidden states.
+            For a given observation, it should contain the log of the probability
+            that it could have been generated (ie emitted) from each of the hidden
+            states. Each entry should be finite and at most 0.
         transition_prob_mat : 2D np.ndarray, shape = [num_states, num_states]
             A nxn dimensional array of floats where n is
             the number of hidden states in the model. The jth col in the ith row
@@ -226,96 +355,340 @@ class HMM(BaseSeriesAnnotator):
             the number of observations (m)
         num_states : int,
             the number of hidden states (n)
+        store_trans_prob : bool, optional, default=False
+            whether to also return the full trans_prob matrix.
+        device : str, optional, default="cpu"
+            device to run the Viterbi recursion on, "cpu" or "cuda".
 
         Returns
         -------
-        trans_prob : 2D np.ndarray, shape = [num_observations, num_hidden_states]
-            an nxm dimensional array which represents the
-            maximum probability of the hidden state of observation m is state n.
+        final_col : 1D np.ndarray, shape = [num_hidden_states]
+            the maximum probability of the hidden state of the last observation
+            being state n, i.e., the last row of trans_prob.
         trans_id : 2D np.ndarray, shape = [num_observations, num_hidden_states]
-            a nxm dimensional array which for each observation
+            a mxn dimensional array which for each observation
             "i" and state "j" the i,j entry records the state_id of the most
-            likely state that could have led to the hidden state being "i" for
-            observation "j".
+            likely state that could have led to the hidden state being "j" for
+            observation "i".
+        trans_prob : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            an mxn dimensional array which represents the
+            maximum probability of the hidden state of observation m is state n.
+            None if ``store_trans_prob`` is False.
         """
+        # take logs once, outside of the loop:
+        dtype = log_emi.dtype
+        log_init = np.log(initial_probs).astype(dtype)
+        log_trans = np.log(transition_prob_mat).astype(dtype)
+
+        if device == "cuda":
+            from sktime.annotation._hmm_cupy import _calculate_trans_mats_cupy
+
+            final_col, trans_id, trans_prob = _calculate_trans_mats_cupy(
+                log_trans, log_emi, log_init, store_trans_prob
+            )
+            HMM._warn_if_inf(final_col)
+            return final_col, trans_id, trans_prob
+
         # trans_prob represents the maximum probability of being in that
-        # state at that stage
-        trans_prob = np.zeros((num_states, num_obs))
-        trans_prob[:, 0] = np.log(initial_probs) + np.log(emi_probs[:, 0])
+        # state at that stage, only the last row is needed for the traceback
+        final_col = np.zeros(num_states, dtype=dtype)
+        trans_prob = None
+        if store_trans_prob:
+            trans_prob = np.zeros((num_obs, num_states), dtype=dtype)
 
         # trans_id is the index of the state that would have been the most
         # likely preceding state.
-        trans_id = np.zeros((num_states, num_obs), dtype=np.int32)
+        trans_id = np.zeros((num_obs, num_states), dtype=np.int32)
 
         # use Vertibi Algorithm to fill in trans_prob and trans_id:
-        for i in range(1, num_obs):
-            # adds log(transition_prob_mat) element-wise:
-            paths = np.log(transition_prob_mat)
-            # adds the probabilities for the state before columns wise:
-            paths += np.stack(
-                [trans_prob[:, i - 1] for _ in range(num_states)], axis=0
-            ).T
-            # adds the probabilities from emission row wise:
-            paths += np.stack(
-                [np.log(emi_probs[:, i]) for _ in range(num_states)], axis=0
+        if _check_soft_dependencies("numba", severity="none"):
+            from sktime.annotation._hmm_numba import (
+                _calculate_trans_mats_2state_numba,
+                _calculate_trans_mats_numba,
             )
-            trans_id[:, i] = np.argmax(paths, axis=0)
-            trans_prob[:, i] = np.max(paths, axis=0)
 
-        if np.any(np.isinf(trans_prob[:, -1])):
+            # numba needs an array, with no rows if trans_prob is not stored
+            trans_prob_out = trans_prob
+            if trans_prob_out is None:
+                trans_prob_out = np.zeros((0, num_states), dtype=dtype)
+            # 2 hidden states are common enough for a dedicated unrolled kernel
+            if num_states == 2:
+                trans_mats_numba = _calculate_trans_mats_2state_numba
+            else:
+                trans_mats_numba = _calculate_trans_mats_numba
+            trans_mats_numba(
+                log_trans, log_emi, log_init, final_col, trans_id, trans_prob_out
+            )
+        else:
+            prev_col = log_init + log_emi[0]
+            cur_col = np.empty(num_states, dtype=dtype)
+            if trans_prob is not None:
+                trans_prob[0] = prev_col
+            # paths[k, j] is the log prob of the best path ending in state k at
+            # the previous step, followed by a transition to and emission from
+            # state j. The buffer is reused across all steps.
+            paths = np.empty((num_states, num_states), dtype=dtype)
+            for i in range(1, num_obs):
+                HMM._combine(log_trans, prev_col, log_emi[i], out=paths)
+                paths.argmax(axis=0, out=trans_id[i])
+                paths.max(axis=0, out=cur_col)
+                if trans_prob is not None:
+                    trans_prob[i] = cur_col
+                prev_col, cur_col = cur_col, prev_col
+            final_col[:] = prev_col
+
+        HMM._warn_if_inf(final_col)
+        return final_col, trans_id, trans_prob
+
+    @staticmethod
+    def _warn_if_inf(final_col: np.ndarray):
+        """Warn if the most likely path ending in some hidden state has prob 0.
+
+        Parameters
+        ----------
+        final_col : 1D np.ndarray, shape = [num_hidden_states]
+            The max log probability of each state at the last step.
+        """
+        if np.any(np.isinf(final_col)):
             warnings.warn(
                 "Change parameters, the distribution doesn't work",
-                stacklevel=2,
+                stacklevel=3,
             )
 
-        return trans_prob, trans_id
+    @staticmethod
+    def _calculate_forward_backward_mats(
+        initial_probs: np.ndarray,
+        log_emi: np.ndarray,
+        transition_prob_mat: np.ndarray,
+    ) -> Tuple[np.array, np.array]:
+        """Calculate the forward and backward mats of the forward-backward algorithm.
+
+        The forward recursion is the same as the Viterbi recursion in
+        ``_calculate_trans_mats``, with the max over preceding states replaced
+        by a sum, i.e., a logsumexp in log space.
+
+        Parameters
+        ----------
+        initial_probs : 1D np.ndarray, shape = [num_hidden_states]
+            The probability of each hidden state for the first observation.
+        log_emi : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            The log of the probability that each observation was emitted from
+            each of the hidden states. Both mats are computed in its float dtype.
+        transition_prob_mat : 2D np.ndarray, shape = [num_states, num_states]
+            The jth col in the ith row represents the probability of
+            transitioning to state j from state i.
+
+        Returns
+        -------
+        log_alpha : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            The i,j entry is the log of the joint probability of the
+            observations up to "i" and the hidden state of observation "i"
+            being "j".
+        log_beta : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            The i,j entry is the log of the probability of the observations
+            after "i", given the hidden state of observation "i" is "j".
+        """
+        num_obs, num_states = log_emi.shape
+        dtype = log_emi.dtype
+        log_trans = np.log(transition_prob_mat).astype(dtype)
+
+        log_alpha = np.zeros((num_obs, num_states), dtype=dtype)
+        log_alpha[0] = np.log(initial_probs) + log_emi[0]
+        paths = np.empty((num_states, num_states), dtype=dtype)
+        for i in range(1, num_obs):
+            HMM._combine(log_trans, log_alpha[i - 1], log_emi[i], out=paths)
+            log_alpha[i] = logsumexp(paths, axis=0)
+
+        log_beta = np.zeros((num_obs, num_states), dtype=dtype)
+        for i in range(num_obs - 2, -1, -1):
+            # paths[k, j] is the log prob of a transition from state k to state
+            # j, followed by emission from and all observations after state j:
+            np.add(log_trans, log_emi[i + 1] + log_beta[i + 1], out=paths)
+            log_beta[i] = logsumexp(paths, axis=1)
+
+        return log_alpha, log_beta
 
     @staticmethod
-    def _make_emission_probs(
-        emission_funcs: list, observations: np.ndarray
+    def _combine(
+        log_trans: np.ndarray,
+        prev_col: np.ndarray,
+        log_emi_col: np.ndarray,
+        out: np.ndarray = None,
     ) -> np.ndarray:
-        """Calculate the prob each obs comes from each hidden state.
+        """Combine the log probs of all paths from one step to the next.
 
         Parameters
         ----------
-        emission_funcs : list, shape = [num_hidden_states]
-            List should be of length n (the number of hidden states)
-            Either a list of callables [fx_1, fx_2] with signature fx_1(X) -> float
-            or a list of callables and matched keyword arguments for those
-            callables [(fx_1, kwarg_1), (fx_2, kwarg_2)] with signature
-            fx_1(X, **kwargs) -> float (or a list with some mixture of the two).
+        log_trans : 2D np.ndarray, shape = [num_states, num_states]
+            The log of the transition probability matrix.
+        prev_col : 1D np.ndarray, shape = [num_hidden_states]
+            The log prob of each hidden state at the previous step.
+        log_emi_col : 1D np.ndarray, shape = [num_hidden_states]
+            The log emission prob of the current observation from each hidden state.
+        out : 2D np.ndarray, shape = [num_states, num_states], optional
+            Array to write the result into, allocated if not passed.
+
+        Returns
+        -------
+        paths : 2D np.ndarray, shape = [num_states, num_states]
+            The k,j entry is the log prob of being in state k at the previous
+            step, followed by a transition to and emission from state j.
+        """
+        paths = np.add(log_trans, prev_col[:, None], out=out)
+        paths += log_emi_col
+        return paths
+
+    @staticmethod
+    def _make_log_emission_probs(
+        emission_callables: List[Callable],
+        observations: np.ndarray,
+        backend: str = None,
+        backend_params: dict = None,
+        dtype="float64",
+    ) -> np.ndarray:
+        """Calculate the log prob each obs comes from each hidden state.
+
+        Log probabilities are computed directly where possible, see
+        ``_apply_log_emission_func``, so that observations far out in the tails
+        of all emission distributions do not turn every path into -inf.
+
+        Parameters
+        ----------
+        emission_callables : list of callables, shape = [num_hidden_states]
+            List should be of length n (the number of hidden states), of
+            callables [fx_1, fx_2] with signature fx_1(X) -> float, as returned
+            by ``_make_emission_callables``.
             The callables should take a value and return a probability when passed
             a single observation. All functions should be properly normalized PDFs
-            over the same space as the observed data.
+            over the same space as the observed data. Callables should preferably
+            also accept a 1D np.ndarray of observations and return an array of
+            probabilities of the same shape, as they are then called only once
+            per hidden state; otherwise they are called once per observation.
         observations : 1D np.ndarray, shape = [num_observations]
             Observations to apply labels to.
+        backend : str, optional, default=None
+            Backend to compute the emission probs of the hidden states in parallel
+            with, passed to ``utils.parallel.parallelize``.
+        backend_params : dict, optional
+            Parameters of the backend, passed to ``utils.parallel.parallelize``.
+        dtype : str or np.dtype, optional, default="float64"
+            Float dtype of the returned log probabilities.
 
         Returns
         -------
-        emi_probs : 2D np.ndarray, shape = [num_observations, num_hidden_states]
-            A nxm dimensional arrayof floats, where n is the
-            number of hidden states and m is the number of observations.
-            For a given observation, it contains the probability that it
-            could havbe been generated (ie emitted) from each of the hidden states
-            Each entry should be between 0 and 1
+        log_emi : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            A mxn dimensional array of floats, where m is the
+            number of observations and n is the number of hidden states.
+            For a given observation, it contains the log of the probability that
+            it could have been generated (ie emitted) from each of the hidden
+            states.
         """
-        # assign emission probabilities from each state to each position:
-
-        emi_probs = np.zeros(shape=(len(emission_funcs), len(observations)))
-        for state_id, emission in enumerate(emission_funcs):
-            if isinstance(emission, tuple):
-                emission_func = emission[0]
-                kwargs = emission[1]
-                emi_probs[state_id, :] = np.array(
-                    [emission_func(x, **kwargs) for x in observations]
-                )
-            else:
-                emi_probs[state_id, :] = np.array([emission(x) for x in observations])
-        return emi_probs
+        # assign log emission probabilities from each state to each position:
+        observations = np.asarray(observations)
+        log_emi = np.zeros(
+            shape=(len(observations), len(emission_callables)), dtype=dtype
+        )
+        # the hidden states are independent, so can be computed in parallel:
+        state_log_probs = parallelize(
+            fun=_make_state_log_emission_probs,
+            iter=emission_callables,
+            meta={"observations": observations},
+            backend=backend,
+            backend_params=backend_params,
+        )
+        for state_id, log_probs in enumerate(state_log_probs):
+            log_emi[:, state_id] = log_probs
+        return log_emi
+
+    @staticmethod
+    def _apply_log_emission_func(
+        emission_func: Callable, observations: np.ndarray
+    ) -> np.ndarray:
+        """Evaluate the log of an emission function on all observations.
+
+        ``scipy.stats.norm.pdf`` with scalar ``loc`` and ``scale`` is evaluated
+        directly in numpy, skipping the scipy distribution machinery.
+        For the ``pdf`` or ``pmf`` of other ``scipy.stats`` distributions, frozen
+        or not, the matching ``logpdf`` or ``logpmf`` is used instead, which does
+        not underflow to 0 far out in the tails. For all other functions, the log
+        of their output is taken, with probabilities of 0 clipped to the smallest
+        positive float, so that they do not turn every path into -inf.
+        Keyword arguments bound with ``functools.partial`` are unwrapped first,
+        so the above also applies to partials.
+
+        Functions are first called once on the whole array of observations,
+        which is fast for vectorized callables such as ``scipy.stats`` PDFs.
+        If that fails, or does not return one value per observation, the
+        function is evaluated one observation at a time instead.
+
+        Parameters
+        ----------
+        emission_func : callable
+            PDF of a hidden state, with signature emission_func(X).
+        observations : 1D np.ndarray, shape = [num_observations]
+            Observations to evaluate the emission function on.
+
+        Returns
+        -------
+        log_probs : 1D np.ndarray, shape = [num_observations]
+            The log of the emission probability of each observation.
+        """
+        # unwrap keyword arguments bound with functools.partial, so that the
+        # fast paths below also apply to partials of scipy.stats densities:
+        func = emission_func
+        kwargs = {}
+        if isinstance(func, partial) and not func.args:
+            kwargs = func.keywords
+            func = func.func
+
+        if func == norm.pdf and kwargs.keys() <= {"loc", "scale"}:
+            loc = kwargs.get("loc", 0.0)
+            scale = kwargs.get("scale", 1.0)
+            if np.ndim(loc) == 0 and np.ndim(scale) == 0 and scale > 0:
+                z = (observations - loc) / scale
+                return -0.5 * z * z - np.log(scale) - _LOG_SQRT_2PI
+
+        log_name = _LOG_DENSITY_NAMES.get(getattr(func, "__name__", None))
+        dist = getattr(func, "__self__", None)
+        if log_name is not None and hasattr(dist, log_name):
+            log_func = partial(getattr(dist, log_name), **kwargs)
+            return HMM._apply_vectorized(log_func, observations)
+
+        probs = HMM._apply_vectorized(emission_func, observations)
+        return np.log(np.clip(probs, _TINY, None))
+
+    @staticmethod
+    def _apply_vectorized(func: Callable, observations: np.ndarray) -> np.ndarray:
+        """Evaluate a function on all observations, vectorized if possible.
+
+        Parameters
+        ----------
+        func : callable
+            Function with signature func(X).
+        observations : 1D np.ndarray, shape = [num_observations]
+            Observations to evaluate the function on.
+
+        Returns
+        -------
+        values : 1D np.ndarray, shape = [num_observations]
+            The value of func at each observation.
+        """
+        try:
+            values = np.asarray(func(observations), dtype=float)
+        except (TypeError, ValueError):
+            values = None
+        if values is None or values.shape != observations.shape:
+            values = np.fromiter(
+                map(func, observations), dtype=float, count=len(observations)
+            )
+        return values
 
     @staticmethod
     def _hmm_viterbi_label(
-        num_obs: int, states: list, trans_prob: np.ndarray, trans_id: np.ndarray
+        num_obs: int,
+        states: np.ndarray,
+        final_col: np.ndarray,
+        trans_id: np.ndarray,
     ) -> np.array:
         """Assign hidden state ids to all observations based on most likely path.
 
@@ -323,12 +696,11 @@ class HMM(BaseSeriesAnnotator):
         ----------
         num_obs : int,
             the number of observations.
-        states : list,
-            a list with integer ids to assign to each hidden state.
-        trans_prob :np.ndarray,
-            a matrix of size [number of observations, number of hidden states]
-            which contains the highest probability path that leads to
-            observation m being assigned to hidden state n.
+        states : 1D np.ndarray, shape = [num_hidden_states]
+            an array with integer ids to assign to each hidden state.
+        final_col : np.ndarray, shape = [num_hidden_states]
+            an array which contains the highest probability path that leads to
+            the last observation being assigned to hidden state n.
         trans_id : np.ndarray, shape = [num_observations, num_hidden_states]
             a matrix of size [number of observations, number of hidden states]
             which contains the state id of the state proceeding this one on the
@@ -337,19 +709,23 @@ class HMM(BaseSeriesAnnotator):
 
         Returns
         -------
-        hmm_fit: np.ndarray, shape = [num_observations]
+        hmm_fit: np.ndarray of np.int32, shape = [num_observations]
             an array of shape [length of the X (obs)].
             each entry in the array is an int representing a hidden id state
             that has been assigned to that observation.
         """
-        hmm_fit = np.zeros(num_obs)
         # Now we trace backwards and find the most likely path:
-        max_inds = np.zeros(num_obs, dtype=np.int32)
-        max_inds[-1] = np.argmax(trans_prob[:, -1])
-        hmm_fit[-1] = states[max_inds[-1]]
-        for index in range(num_obs - 1, 0, -1):
-            max_inds[index - 1] = trans_id[max_inds[index], index]
-            hmm_fit[index - 1] = states[max_inds[index - 1]]
+        max_inds = np.empty(num_obs, dtype=np.int32)
+        if _check_soft_dependencies("numba", severity="none"):
+            from sktime.annotation._hmm_numba import _viterbi_traceback_numba
+
+            _viterbi_traceback_numba(final_col, trans_id, max_inds)
+        else:
+            max_inds[-1] = np.argmax(final_col)
+            for index in range(num_obs - 1, 0, -1):
+                max_inds[index - 1] = trans_id[index, max_inds[index]]
+        # map the state indices to the state ids in one go:
+        hmm_fit = states[max_inds]
         return hmm_fit
 
     def _fit(self, X, Y=None):
@@ -378,28 +754,96 @@ class HMM(BaseSeriesAnnotator):
         Returns
         -------
         annotated_x : array-like, shape = [num_observations]
-            Array of predicted class labels, same size as input.
+            Array of predicted integer class labels, same size as input.
         """
         self.num_states = len(self.emission_funcs)
-        self.states = list(range(self.num_states))
+        self.states = np.arange(self.num_states, dtype=np.int32)
         self.num_obs = len(X)
-        emi_probs = self._make_emission_probs(self.emission_funcs, X)
-        init_probs = self.initial_probs
-        if self.initial_probs is None:
-            init_probs = 1.0 / self.num_states * np.ones(self.num_states)
-        trans_prob, trans_id = self._calculate_trans_mats(
+        log_emi = self._make_log_emission_probs(
+            self._emission_callables,
+            X,
+            self.backend,
+            self.backend_params,
+            self.dtype,
+        )
+        init_probs = self._get_initial_probs()
+        final_col, trans_id, trans_prob = self._calculate_trans_mats(
             init_probs,
-            emi_probs,
+            log_emi,
             self.transition_prob_mat,
             self.num_obs,
             self.num_states,
+            self.store_trans_prob,
+            self.device,
         )
 
         self.trans_prob = trans_prob
         self.trans_id = trans_id
         return self._hmm_viterbi_label(
-            self.num_obs, self.states, self.trans_prob, self.trans_id
+            self.num_obs, self.states, final_col, self.trans_id
+        )
+
+    def predict_proba(self, X):
+        """Return the posterior probability of each hidden state for each obs.
+
+        Uses the forward-backward algorithm, in contrast to ``predict``, which
+        returns the single most likely sequence of hidden states.
+
+        Parameters
+        ----------
+        X : 1D np.array, shape = [num_observations]
+            Observations to compute hidden state probabilities for.
+
+        Returns
+        -------
+        probs : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            The i,j entry is the probability that the hidden state of observation
+            "i" is "j", given all observations. Each row sums to 1.
+        """
+        self.check_is_fitted()
+        X = check_series(X)
+        return self._predict_proba(X)
+
+    def _predict_proba(self, X):
+        """Return the posterior probability of each hidden state for each obs.
+
+        Parameters
+        ----------
+        X : 1D np.array, shape = [num_observations]
+            Observations to compute hidden state probabilities for.
+
+        Returns
+        -------
+        probs : 2D np.ndarray, shape = [num_observations, num_hidden_states]
+            The i,j entry is the probability that the hidden state of observation
+            "i" is "j", given all observations.
+        """
+        log_emi = self._make_log_emission_probs(
+            self._emission_callables,
+            X,
+            self.backend,
+            self.backend_params,
+            self.dtype,
         )
+        log_alpha, log_beta = self._calculate_forward_backward_mats(
+            self._get_initial_probs(), log_emi, self.transition_prob_mat
+        )
+        log_posterior = log_alpha + log_beta
+        log_posterior -= logsumexp(log_alpha[-1])
+        return np.exp(log_posterior)
+
+    def _get_initial_probs(self):
+        """Return the initial probs, uniform over the hidden states if not passed.
+
+        Returns
+        -------
+        initial_probs : 1D np.ndarray, shape = [num_hidden_states]
+            The probability of each hidden state for the first observation.
+        """
+        if self.initial_probs is not None:
+            return self.initial_probs
+        num_states = len(self.emission_funcs)
+        return 1.0 / num_states * np.ones(num_states)
 
     @classmethod
     def get_test_params(cls, parameter_set="default"):
@@ -418,7 +862,7 @@ class HMM(BaseSeriesAnnotator):
         centers = [3.5, -5]
         sd = [100 for _ in centers]
         emi_funcs = [
-            (norm.pdf, {"loc": mean, "scale": sd[ind]})
+            partial(norm.pdf, loc=mean, scale=sd[ind])
             for ind, mean in enumerate(centers)
         ]
 
@@ -428,6 +872,28 @@ class HMM(BaseSeriesAnnotator):
             "emission_funcs": emi_funcs,
             "transition_prob_mat": trans_mat,
             "initial_probs": np.asarray([0.2, 0.8]),
+            "backend": "threading",
+            "backend_params": {"n_jobs": 2},
+            "store_trans_prob": True,
+            "dtype": "float32",
         }
 
         return [params_1, params_2]
+
+
+def _make_state_log_emission_probs(emission_func, meta):
+    """Calculate the log emission probs of all observations for one hidden state.
+
+    Parameters
+    ----------
+    emission_func : callable
+        The emission function of the hidden state, with signature fx(X).
+    meta : dict
+        Must contain the observations under the key "observations".
+
+    Returns
+    -------
+    log_probs : 1D np.ndarray, shape = [num_observations]
+        The log of the emission probability of each observation.
+    """
+    return HMM._apply_log_emission_func(emission_func, meta["observations"])
@@ -2,12 +2,17 @@
 
 __author__ = ["miraep8"]
 
+import itertools
+import warnings
+from functools import partial
+
 import numpy as np
 import pytest
 from numpy import array_equal, asarray
 from scipy.stats import norm
 
 from sktime.annotation.hmm import HMM
+from sktime.utils.dependencies import _check_soft_dependencies
 
 
 def test_hmm_basic_gauss():
@@ -58,6 +63,21 @@ def test_reject_bad_inputs():
             emission_funcs=valid_emi_funcs,
             transition_prob_mat=asarray([[10, 10], [0.2, 0.8]]),
         )
+    # initial_probs must sum to 1:
+    with pytest.raises(ValueError):
+        HMM(
+            emission_funcs=valid_emi_funcs,
+            transition_prob_mat=asarray([[0.5, 0.5], [0.2, 0.8]]),
+            initial_probs=asarray([0.5, 0.6]),
+        )
+    # dtype must be a supported float dtype:
+    for dtype in ["float16", "int32", "not_a_dtype"]:
+        with pytest.raises(ValueError):
+            HMM(
+                emission_funcs=valid_emi_funcs,
+                transition_prob_mat=asarray([[0.5, 0.5], [0.2, 0.8]]),
+                dtype=dtype,
+            )
     # emi_funcs and trans mat must have shared dimension:
     with pytest.raises(ValueError):
         HMM(
@@ -83,3 +103,178 @@ def test_hmm_behaves_as_expected_on_simple_input():
     labels = hmm_est.predict(obs)
     ground_truth = asarray([0, 0, 0, 0, 1, 1, 1])
     assert array_equal(labels, ground_truth)
+    assert np.issubdtype(labels.dtype, np.integer)
+
+
+def test_hmm_handles_zero_emission_probs():
+    """Test HMM still labels observations all emission PDFs underflow on."""
+    trans_mat = asarray([[0.9, 0.1], [0.1, 0.9]])
+    obs = asarray([0.1, -0.1, 0.0, 1000.0, 10.1, 9.9])
+    # log densities are exact, so the far closer state 1 wins at 1000.0
+    emi_funcs = [(norm.pdf, {"loc": mean, "scale": 0.1}) for mean in [0, 10]]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        labels = HMM(emi_funcs, trans_mat).fit(obs).predict(obs)
+    assert array_equal(labels, asarray([0, 0, 0, 1, 1, 1]))
+    # PDFs only known as plain callables underflow to 0 in both states at 1000.0,
+    # so the transition matrix decides the label
+    emi_funcs = [lambda x, m=mean: norm.pdf(x, loc=m, scale=0.1) for mean in [0, 10]]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        labels = HMM(emi_funcs, trans_mat).fit(obs).predict(obs)
+    assert array_equal(labels, asarray([0, 0, 0, 0, 1, 1]))
+
+
+def test_hmm_resolves_log_probs_below_tiny():
+    """Test HMM picks the likelier state when all PDFs are below the tiny float."""
+    emi_funcs = [(norm.pdf, {"loc": mean, "scale": 1}) for mean in [0, 10]]
+    hmm_est = HMM(emi_funcs, asarray([[0.9, 0.1], [0.1, 0.9]]))
+    # log probs of 50.0 are about -1250.9 and -800.9, both below log(tiny)
+    obs = asarray([0.1, -0.1, 50.0, 0.0])
+    labels = hmm_est.fit(obs).predict(obs)
+    assert array_equal(labels, asarray([0, 0, 1, 0]))
+
+
+@pytest.mark.skipif(
+    not _check_soft_dependencies("numba", severity="none"),
+    reason="skip test if required soft dependency not available",
+)
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+@pytest.mark.parametrize("num_states", [2, 4])
+def test_hmm_numba_matches_numpy(monkeypatch, dtype, num_states):
+    """Test the numba and numpy Viterbi implementations agree."""
+    rng = np.random.default_rng(42)
+    num_obs = 600
+    initial_probs = rng.dirichlet(np.ones(num_states))
+    transition_prob_mat = rng.dirichlet(np.ones(num_states), size=num_states)
+    log_emi = np.log(rng.random((num_obs, num_states))).astype(dtype)
+    args = (initial_probs, log_emi, transition_prob_mat, num_obs, num_states)
+
+    states = np.arange(num_states, dtype=np.int32)
+
+    numba_final, numba_id, numba_prob = HMM._calculate_trans_mats(*args, True)
+    numba_labels = HMM._hmm_viterbi_label(num_obs, states, numba_final, numba_id)
+    monkeypatch.setattr(
+        "sktime.annotation.hmm._check_soft_dependencies", lambda *_, **__: False
+    )
+    numpy_final, numpy_id, numpy_prob = HMM._calculate_trans_mats(*args, True)
+    numpy_labels = HMM._hmm_viterbi_label(num_obs, states, numpy_final, numpy_id)
+
+    assert numba_final.dtype == numpy_final.dtype == dtype
+    assert np.allclose(numba_prob, numpy_prob)
+    assert np.allclose(numba_final, numpy_prob[-1])
+    assert np.allclose(numpy_final, numpy_prob[-1])
+    assert array_equal(numba_id, numpy_id)
+    assert array_equal(numba_labels, numpy_labels)
+
+
+def test_hmm_norm_pdf_fast_path():
+    """Test the numpy Gaussian log emission probs match scipy's norm.logpdf."""
+    obs = np.linspace(-10, 10, 101)
+    emission_func = partial(norm.pdf, loc=1.5, scale=0.3)
+    log_probs = HMM._apply_log_emission_func(emission_func, obs)
+    assert np.allclose(log_probs, norm.logpdf(obs, loc=1.5, scale=0.3), rtol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "emission_func",
+    [
+        (norm.pdf, {"loc": 1.5, "scale": 0.3}),
+        partial(norm.pdf, loc=1.5, scale=0.3),
+        norm(loc=1.5, scale=0.3).pdf,
+        lambda x: norm.pdf(x, loc=1.5, scale=0.3),
+        lambda x: float(norm.pdf(x, loc=1.5, scale=0.3)),
+    ],
+)
+def test_hmm_log_emission_probs(emission_func):
+    """Test log emission probs for all supported kinds of emission funcs."""
+    obs = np.linspace(-3, 6, 101)
+    (emission_callable,) = HMM._make_emission_callables([emission_func])
+    log_probs = HMM._apply_log_emission_func(emission_callable, obs)
+    assert np.allclose(log_probs, norm.logpdf(obs, loc=1.5, scale=0.3))
+
+
+def test_hmm_accepts_rounded_initial_probs():
+    """Test initial probs which sum to 1 only up to float rounding are accepted."""
+    initial_probs = asarray([0.7, 0.2, 0.1])
+    assert sum(initial_probs) != 1
+    HMM(
+        emission_funcs=[(norm.pdf, {"loc": mean, "scale": 1}) for mean in range(3)],
+        transition_prob_mat=np.full((3, 3), 1 / 3),
+        initial_probs=initial_probs,
+    )
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_hmm_predict_proba(dtype):
+    """Test predict_proba matches posteriors computed by enumerating all paths."""
+    emi_funcs = [(norm.pdf, {"loc": mean, "scale": 1}) for mean in [0, 2]]
+    transition_prob_mat = asarray([[0.7, 0.3], [0.4, 0.6]])
+    initial_probs = asarray([0.6, 0.4])
+    obs = asarray([0.1, 1.2, 2.3, 0.8, 1.9])
+    hmm_est = HMM(emi_funcs, transition_prob_mat, initial_probs, dtype=dtype)
+    probs = hmm_est.fit(obs).predict_proba(obs)
+
+    emi_probs = np.stack([func(obs, **kwargs) for func, kwargs in emi_funcs], axis=1)
+    expected = np.zeros((len(obs), 2))
+    for path in itertools.product([0, 1], repeat=len(obs)):
+        path_prob = initial_probs[path[0]] * emi_probs[0, path[0]]
+        for i in range(1, len(obs)):
+            path_prob *= transition_prob_mat[path[i - 1], path[i]]
+            path_prob *= emi_probs[i, path[i]]
+        expected[np.arange(len(obs)), path] += path_prob
+    expected /= expected.sum(axis=1, keepdims=True)
+
+    assert probs.shape == (len(obs), 2)
+    assert probs.dtype == np.dtype(dtype)
+    assert np.allclose(probs, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("store_trans_prob", [True, False])
+def test_hmm_store_trans_prob(store_trans_prob):
+    """Test trans_prob is only stored if requested, without changing labels."""
+    emi_funcs = [(norm.pdf, {"loc": mean, "scale": 1}) for mean in [0, 5]]
+    hmm_est = HMM(
+        emi_funcs,
+        asarray([[0.9, 0.1], [0.1, 0.9]]),
+        store_trans_prob=store_trans_prob,
+    )
+    obs = asarray([0.2, -0.3, 5.1, 4.8, 0.1])
+    labels = hmm_est.fit(obs).predict(obs)
+    assert array_equal(labels, asarray([0, 0, 1, 1, 0]))
+    if store_trans_prob:
+        assert hmm_est.trans_prob.shape == (len(obs), 2)
+    else:
+        assert hmm_est.trans_prob is None
+
+
+def test_hmm_reject_bad_device():
+    """Test HMM raises on unknown devices, and on cuda if cupy is not present."""
+    emi_funcs = [partial(norm.pdf, loc=mean, scale=1) for mean in [0, 5]]
+    transition_prob_mat = asarray([[0.9, 0.1], [0.1, 0.9]])
+    with pytest.raises(ValueError):
+        HMM(emi_funcs, transition_prob_mat, device="tpu")
+    if not _check_soft_dependencies("cupy", severity="none"):
+        with pytest.raises(ModuleNotFoundError):
+            HMM(emi_funcs, transition_prob_mat, device="cuda")
+
+
+@pytest.mark.skipif(
+    not _check_soft_dependencies("cupy", severity="none"),
+    reason="skip test if required soft dependency not available",
+)
+def test_hmm_cuda_matches_cpu():
+    """Test the cuda and cpu Viterbi implementations agree."""
+    rng = np.random.default_rng(42)
+    num_states, num_obs = 4, 600
+    initial_probs = rng.dirichlet(np.ones(num_states))
+    transition_prob_mat = rng.dirichlet(np.ones(num_states), size=num_states)
+    log_emi = np.log(rng.random((num_obs, num_states)))
+    args = (initial_probs, log_emi, transition_prob_mat, num_obs, num_states, True)
+
+    cpu_final, cpu_id, cpu_prob = HMM._calculate_trans_mats(*args, "cpu")
+    cuda_final, cuda_id, cuda_prob = HMM._calculate_trans_mats(*args, "cuda")
+
+    assert np.allclose(cuda_final, cpu_final)
+    assert np.allclose(cuda_prob, cpu_prob)
+    assert array_equal(cuda_id, cpu_id)